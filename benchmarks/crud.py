@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+from time import perf_counter
+
+from raziosapi.database.crud import CRUD
+from raziosapi.database.memory import MemoryDatabase, MemorySession
+from raziosapi.database.models import TransferModel, WalletModel
+
+
+def wallet_id(number: int) -> str:
+    return f"{number:016x}"
+
+async def seed(session: MemorySession, wallets: int) -> None:
+    await CRUD(WalletModel, session).create_many([
+        dict(
+            id=wallet_id(number),
+            telegram_id=number + 1,
+            access_token=f"token{number}",
+            balance=1_000_000
+        )
+        for number in range(wallets)
+    ])
+
+    await CRUD(TransferModel, session).create_many([
+        dict(
+            id=f"{number:040x}",
+            sender_id=wallet_id(number),
+            receiver_id=wallet_id((number + 1) % wallets),
+            amount=1,
+            from_cheque_id=None
+        )
+        for number in range(wallets)
+    ])
+
+async def measure(name: str, ops: int, operation) -> None:
+    started = perf_counter()
+
+    for number in range(ops):
+        await operation(number)
+
+    elapsed = perf_counter() - started
+    print(f"{name:<28} {ops / elapsed:>12,.0f} ops/sec")
+
+async def main(wallets: int, ops: int) -> None:
+    database = MemoryDatabase()
+    seed_session = database.session()
+
+    started = perf_counter()
+    await seed(seed_session, wallets)
+    print(f"{'seed (wallets + transfers)':<28} {2 * wallets / (perf_counter() - started):>12,.0f} rows/sec")
+
+    async def get_by_id(number):
+        async with database.session() as session:
+            await CRUD(WalletModel, session).get(id=wallet_id(number % wallets))
+
+    async def get_by_access_token(number):
+        async with database.session() as session:
+            await CRUD(WalletModel, session).get(access_token=f"token{number % wallets}")
+
+    async def is_exist_activation(number):
+        async with database.session() as session:
+            await CRUD(TransferModel, session).is_exist(
+                receiver_id=wallet_id(number % wallets), from_cheque_id=None
+            )
+
+    async def update_balance(number):
+        async with database.session() as session:
+            wallet = await CRUD(WalletModel, session).get(id=wallet_id(number % wallets))
+            wallet.balance -= 1
+            await session.commit()
+
+    async def update_balance_in_seed_session(number):
+        wallet = await CRUD(WalletModel, seed_session).get(id=wallet_id(number % wallets))
+        wallet.balance -= 1
+        await seed_session.commit()
+
+    async def locked_transfer(number):
+        sender, receiver = wallet_id(number % wallets), wallet_id((number + 7) % wallets)
+
+        async with database.session() as session:
+            await CRUD(WalletModel, session).get_many_for_update([sender, receiver])
+            await CRUD(WalletModel, session).increment_many(
+                WalletModel.balance, {sender: -1, receiver: 1}
+            )
+            await session.commit()
+
+    async def create_transfer(number):
+        async with database.session() as session:
+            await CRUD(TransferModel, session).create(
+                id=f"t{number:039x}",
+                sender_id=wallet_id(number % wallets),
+                receiver_id=wallet_id((number + 3) % wallets),
+                amount=1
+            )
+
+    await measure("get by id", ops, get_by_id)
+    await measure("get by access_token", ops, get_by_access_token)
+    await measure("is_exist (receiver, cheque)", ops, is_exist_activation)
+    await measure("update balance", ops, update_balance)
+    await measure("update in seed session", ops, update_balance_in_seed_session)
+    await measure("locked two-wallet transfer", ops, locked_transfer)
+    await measure("create transfer", ops, create_transfer)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure in-memory CRUD throughput")
+    parser.add_argument("--wallets", type=int, default=1_000_000)
+    parser.add_argument("--ops", type=int, default=200_000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.wallets, args.ops))
@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import os
+from time import perf_counter
+
+os.environ.setdefault("DB_BACKEND", "memory")
+
+import httpx
+
+from raziosapi.__main__ import app
+from raziosapi.database.core import Session, create_models
+from raziosapi.database.crud import CRUD
+from raziosapi.database.models import WalletModel
+
+
+PAYER = {"access-token": "payer"}
+MERCHANT = {"access-token": "merchant"}
+INVOICE = {"amount": 1, "max_payments_count": 1, "expiration_at": None}
+BATCH_SIZE = 100
+
+def chunks(items: list, size: int) -> list[list]:
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+async def seed(invoices: int) -> None:
+    await create_models()
+
+    async with Session() as session:
+        await CRUD(WalletModel, session).create_many([
+            dict(id="p" * 16, telegram_id=1, access_token="payer", balance=4 * invoices),
+            dict(id="m" * 16, telegram_id=2, access_token="merchant", balance=0)
+        ])
+
+async def create_single(client: httpx.AsyncClient, invoices: int) -> list[str]:
+    ids = []
+
+    for _ in range(invoices):
+        response = await client.post("/invoices/new", headers=MERCHANT, json=INVOICE)
+        ids.append(response.raise_for_status().json()["id"])
+
+    return ids
+
+async def create_batch(client: httpx.AsyncClient, invoices: int) -> list[str]:
+    ids = []
+
+    for chunk in chunks([INVOICE] * invoices, BATCH_SIZE):
+        response = await client.post("/invoices/batch", headers=MERCHANT, json={"invoices": chunk})
+        ids += [invoice["id"] for invoice in response.raise_for_status().json()]
+
+    return ids
+
+async def pay_single(client: httpx.AsyncClient, ids: list[str]) -> None:
+    for id in ids:
+        response = await client.put(f"/invoices/{id}/pay", headers=PAYER, json={"amount": None})
+        response.raise_for_status()
+
+async def pay_batch(client: httpx.AsyncClient, ids: list[str]) -> None:
+    for chunk in chunks(ids, BATCH_SIZE):
+        response = await client.put("/invoices/pay", headers=PAYER, json={"ids": chunk})
+        response.raise_for_status()
+
+async def measure(name: str, invoices: int, operation, *args):
+    started = perf_counter()
+    result = await operation(*args)
+    elapsed = perf_counter() - started
+    print(f"{name:<34} {elapsed:>8.3f}s {invoices / elapsed:>10,.0f} invoices/sec")
+    return result
+
+async def main(invoices: int) -> None:
+    await seed(invoices)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        single_ids = await measure("POST /invoices/new x N", invoices, create_single, client, invoices)
+        batch_ids = await measure(f"POST /invoices/batch (by {BATCH_SIZE})", invoices, create_batch, client, invoices)
+        await measure("PUT /invoices/{id}/pay x N", invoices, pay_single, client, single_ids)
+        await measure(f"PUT /invoices/pay (by {BATCH_SIZE})", invoices, pay_batch, client, batch_ids)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare batch and single invoice endpoints")
+    parser.add_argument("--invoices", type=int, default=5_000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.invoices))
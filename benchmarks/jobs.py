@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import multiprocessing
+from secrets import token_hex
+from time import perf_counter
+
+from sqlalchemy import delete, func, select
+
+from raziosapi.enums import JobStates
+from raziosapi.jobs import Worker, job
+from raziosapi.database.crud import CRUD
+from raziosapi.database.core import Session, create_models
+from raziosapi.database.models import JobModel
+
+
+@job("benchmark_noop")
+async def noop(session) -> None:
+    return None
+
+async def count_pending() -> int:
+    stmt = (
+        select(func.count())
+        .select_from(JobModel)
+        .where(JobModel.name == "benchmark_noop", JobModel.state != JobStates.DONE)
+    )
+
+    async with Session() as session:
+        return await session.scalar(stmt)
+
+async def run_worker(concurrency: int) -> None:
+    worker = Worker(concurrency=concurrency, poll_interval=0.05)
+
+    async def watch():
+        while await count_pending():
+            await asyncio.sleep(0.05)
+        worker.stop()
+
+    watcher = asyncio.create_task(watch())
+    await worker.run()
+    await watcher
+
+def worker_process(concurrency: int) -> None:
+    asyncio.run(run_worker(concurrency))
+
+async def prepare(jobs: int) -> None:
+    await create_models()
+
+    async with Session() as session:
+        await session.execute(delete(JobModel).where(JobModel.name == "benchmark_noop"))
+        await session.commit()
+
+        await CRUD(JobModel, session).create_many([
+            dict(
+                id=token_hex(16),
+                name="benchmark_noop",
+                state=JobStates.QUEUED,
+                payload={}
+            )
+            for _ in range(jobs)
+        ])
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure job queue throughput")
+    parser.add_argument("--jobs", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    asyncio.run(prepare(args.jobs))
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=worker_process, args=(args.concurrency,))
+        for _ in range(args.workers)
+    ]
+
+    started = perf_counter()
+
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+
+    elapsed = perf_counter() - started
+    print(
+        f"{args.jobs} jobs, {args.workers} workers x {args.concurrency}: "
+        f"{elapsed:.2f}s, {args.jobs / elapsed:.0f} jobs/sec"
+    )
+
+if __name__ == "__main__":
+    main()
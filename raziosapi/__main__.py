@@ -1,17 +1,22 @@
 import asyncio
+import logging
+import sys
 
 import uvicorn
 from fastapi import FastAPI
 
+from raziosapi.config import DB_BACKEND
 from raziosapi.database.core import (
     create_models,
     drop_models
 )
+from raziosapi.jobs import Worker
 from raziosapi.routers import (
     wallet_router,
     transfers_router,
     cheques_router,
-    invoices_router
+    invoices_router,
+    jobs_router
 )
 
 
@@ -21,6 +26,14 @@ app.include_router(wallet_router)
 app.include_router(transfers_router)
 app.include_router(cheques_router)
 app.include_router(invoices_router)
+app.include_router(jobs_router)
 
 if __name__ == "__main__":
-    uvicorn.run("raziosapi.__main__:app", host="localhost", port=8080, reload=True)
+    if sys.argv[1:2] == ["worker"]:
+        if DB_BACKEND == "memory":
+            sys.exit("The worker needs a database backend; with DB_BACKEND=memory jobs run inline")
+
+        logging.basicConfig(level=logging.INFO)
+        asyncio.run(Worker().serve())
+    else:
+        uvicorn.run("raziosapi.__main__:app", host="localhost", port=8080, reload=True)
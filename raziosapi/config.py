@@ -3,6 +3,7 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+DB_BACKEND = os.getenv("DB_BACKEND", "sqlalchemy")
 
 SQLALCHEMY_DRIVER = os.getenv("SQLALCHEMY_DRIVER")
 DB_USER = os.getenv("DB_USER")
@@ -11,3 +12,10 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 DB_URL = f"{SQLALCHEMY_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+TEST_DB_URL = os.getenv("TEST_DB_URL")
+
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", 4))
+WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", 1))
+WORKER_RETRY_DELAY = float(os.getenv("WORKER_RETRY_DELAY", 5))
+WORKER_JOB_TIMEOUT = float(os.getenv("WORKER_JOB_TIMEOUT", 600))
+WORKER_JOB_LEASE = float(os.getenv("WORKER_JOB_LEASE", 2 * WORKER_JOB_TIMEOUT))
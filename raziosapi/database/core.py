@@ -7,21 +7,35 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine
 )
 
-from raziosapi.config import DB_URL
+from raziosapi.config import DB_BACKEND, DB_URL
+from raziosapi.database.memory import MemoryDatabase, MemorySession
 from raziosapi.database.models import BaseModel
 
 
-engine = create_async_engine(DB_URL)
-Session = async_sessionmaker(engine, expire_on_commit=False)
+if DB_BACKEND == "memory":
+    engine = None
+    database = MemoryDatabase(BaseModel)
+    Session = database.session
+else:
+    engine = create_async_engine(DB_URL)
+    database = None
+    Session = async_sessionmaker(engine, expire_on_commit=False)
 
-async def get_session() -> Iterator[AsyncSession]:
-    async with sessionmaker() as session:
+async def get_session() -> Iterator[AsyncSession | MemorySession]:
+    async with Session() as session:
         yield session
                                                                    
 async def create_models() -> None:
+    if engine is None:
+        return
+
     async with engine.begin() as conn:
         await conn.run_sync(BaseModel.metadata.create_all)
 
 async def drop_models() -> None:
+    if engine is None:
+        database.clear()
+        return
+
     async with engine.begin() as conn:
         await conn.run_sync(BaseModel.metadata.drop_all)
@@ -1,35 +1,96 @@
+from abc import ABC, abstractmethod
 from typing import Type
 
-from sqlalchemy import desc, select
+from sqlalchemy import case, desc, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, raiseload
 
+from raziosapi.database.memory import MemorySession
 from raziosapi.database.models import BaseModel
 
 
-class CRUD:
-    def __init__(self, model: Type[BaseModel], session: AsyncSession):
+class CRUD(ABC):
+    def __new__(cls, model: Type[BaseModel], session: AsyncSession | MemorySession):
+        if cls is CRUD:
+            cls = MemoryCRUD if isinstance(session, MemorySession) else SQLAlchemyCRUD
+        return super().__new__(cls)
+
+    def __init__(self, model: Type[BaseModel], session: AsyncSession | MemorySession):
         self.model = model
         self.session = session
 
+    @abstractmethod
+    async def create(self, **kwargs) -> Type[BaseModel]: ...
+
+    @abstractmethod
+    async def create_many(self, rows: list[dict]) -> list[Type[BaseModel]]: ...
+
+    @abstractmethod
+    async def is_exist(self, **kwargs) -> bool: ...
+
+    @abstractmethod
+    async def get(self, **kwargs) -> Type[BaseModel]: ...
+
+    @abstractmethod
+    async def get_many_for_update(self, ids: list[str]) -> list[Type[BaseModel]]: ...
+
+    @abstractmethod
+    async def order_by(
+        self,
+        column: InstrumentedAttribute,
+        limit: int,
+        use_desc: bool = True
+    ) -> list[Type[BaseModel]]: ...
+
+    @abstractmethod
+    async def update(self, model: Type[BaseModel]) -> Type[BaseModel]: ...
+
+    @abstractmethod
+    async def increment_many(
+        self,
+        column: InstrumentedAttribute,
+        values: dict[str, int]
+    ) -> None: ...
+
+    @abstractmethod
+    async def delete(self, model: Type[BaseModel]) -> None: ...
+
+class SQLAlchemyCRUD(CRUD):
     async def create(self, **kwargs) -> Type[BaseModel]:
         model = self.model(**kwargs)
         self.session.add(model)
         await self.session.commit()
         return model
 
+    async def create_many(self, rows: list[dict]) -> list[Type[BaseModel]]:
+        stmt = insert(self.model).returning(self.model)
+        results = (await self.session.scalars(stmt, rows)).unique().all()
+        await self.session.commit()
+        return results
+
     async def is_exist(self, **kwargs) -> bool:
-        stmt = select(self.model).filter_by(**kwargs)
-        result = (await self.session.scalar(stmt)).unique()
-        return result is not None
+        return await self.get(**kwargs) is not None
 
     async def get(self, **kwargs) -> Type[BaseModel]:
         stmt = select(self.model).filter_by(**kwargs)
-        result = (await self.session.scalar(stmt)).unique()
+        result = (await self.session.scalars(stmt)).unique().first()
         return result
 
+    async def get_many_for_update(self, ids: list[str]) -> list[Type[BaseModel]]:
+        stmt = (
+            select(self.model)
+            .where(self.model.id.in_(ids))
+            .order_by(self.model.id)
+            .options(raiseload("*"))
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        results = (await self.session.scalars(stmt)).all()
+        return results
+
     async def order_by(
         self,
-        column,
+        column: InstrumentedAttribute,
         limit: int,
         use_desc: bool = True
     ) -> list[Type[BaseModel]]:
@@ -38,7 +99,7 @@ class CRUD:
             .order_by(desc(column) if use_desc else column)
             .limit(limit)
         )
-        results = await(self.session.scalars()).unique()
+        results = (await self.session.scalars(stmt)).unique().all()
         return results
 
     async def update(self, model: Type[BaseModel]) -> Type[BaseModel]:
@@ -46,6 +107,70 @@ class CRUD:
         await self.session.commit()
         return await self.get(id=model.id)
 
+    async def increment_many(
+        self,
+        column: InstrumentedAttribute,
+        values: dict[str, int]
+    ) -> None:
+        stmt = (
+            update(self.model)
+            .where(self.model.id.in_(values))
+            .values({column: column + case(values, value=self.model.id, else_=0)})
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(stmt)
+
+    async def delete(self, model: Type[BaseModel]) -> None:
+        await self.session.delete(model)
+        await self.session.commit()
+
+class MemoryCRUD(CRUD):
+    async def create(self, **kwargs) -> Type[BaseModel]:
+        model = self.session.new(self.model, kwargs)
+        await self.session.commit()
+        return model
+
+    async def create_many(self, rows: list[dict]) -> list[Type[BaseModel]]:
+        results = [self.session.new(self.model, row) for row in rows]
+        await self.session.commit()
+        return results
+
+    async def is_exist(self, **kwargs) -> bool:
+        return self.session.first(self.model, kwargs) is not None
+
+    async def get(self, **kwargs) -> Type[BaseModel]:
+        return self.session.first(self.model, kwargs)
+
+    async def get_many_for_update(self, ids: list[str]) -> list[Type[BaseModel]]:
+        await self.session.lock(self.model, ids)
+        results = [self.session.get(self.model, id, refresh=True) for id in sorted(set(ids))]
+        return [result for result in results if result is not None]
+
+    async def order_by(
+        self,
+        column: InstrumentedAttribute,
+        limit: int,
+        use_desc: bool = True
+    ) -> list[Type[BaseModel]]:
+        results = sorted(
+            self.session.select(self.model, {}),
+            key=lambda result: getattr(result, column.key),
+            reverse=use_desc
+        )
+        return results[:limit]
+
+    async def update(self, model: Type[BaseModel]) -> Type[BaseModel]:
+        self.session.add(model)
+        await self.session.commit()
+        return await self.get(id=model.id)
+
+    async def increment_many(
+        self,
+        column: InstrumentedAttribute,
+        values: dict[str, int]
+    ) -> None:
+        await self.session.increment(self.model, column.key, values)
+
     async def delete(self, model: Type[BaseModel]) -> None:
         self.session.delete(model)
         await self.session.commit()
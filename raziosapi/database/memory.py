@@ -0,0 +1,488 @@
+import asyncio
+from collections import deque
+from typing import Any, Type
+
+from sqlalchemy.orm import RelationshipProperty
+
+from raziosapi.database.models import BaseModel
+
+
+class MemoryIntegrityError(Exception):
+    pass
+
+class MemoryStaleDataError(Exception):
+    pass
+
+class MemoryDeadlockError(Exception):
+    pass
+
+class MemoryRecord:
+    def __init__(self, session: "MemorySession", model: Type[BaseModel], values: dict):
+        self.__dict__.update(values)
+        self.__dict__["_session"] = session
+        self.__dict__["_model"] = model
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self.__dict__[name] = value
+        self._session.dirty.add((self._model, self.id))
+
+    def __getattr__(self, name: str) -> Any:
+        relationship = self._model.__mapper__.relationships.get(name)
+
+        if relationship is None:
+            raise AttributeError(name)
+
+        return self._session.resolve(self, relationship)
+
+class MemoryDatabase:
+    def __init__(self, base: Type[BaseModel] = BaseModel):
+        self.tables: dict[Type[BaseModel], dict[str, dict]] = {}
+        self.columns: dict[Type[BaseModel], list[str]] = {}
+        self.indexes: dict[Type[BaseModel], dict[tuple[str, ...], dict[tuple, dict[str, None]]]] = {}
+        self.unique: dict[Type[BaseModel], list[tuple[str, ...]]] = {}
+        self.defaults: dict[Type[BaseModel], list[tuple[str, Any]]] = {}
+        self.onupdates: dict[Type[BaseModel], list[tuple[str, Any]]] = {}
+        self.plans: dict[Type[BaseModel], dict[frozenset, tuple[str, ...] | None]] = {}
+        self.locks: dict[tuple[Type[BaseModel], str], deque[tuple[asyncio.Future, "MemorySession"]]] = {}
+        self.owners: dict[tuple[Type[BaseModel], str], "MemorySession"] = {}
+        self.waiting: dict["MemorySession", tuple[Type[BaseModel], str]] = {}
+
+        for mapper in base.registry.mappers:
+            self.register(mapper.class_)
+
+    def register(self, model: Type[BaseModel]) -> None:
+        table = model.__table__
+        indexes = {
+            tuple(column.name for column in index.columns): index.unique
+            for index in table.indexes
+        }
+
+        for column in table.columns:
+            if column.foreign_keys or column.unique:
+                indexes.setdefault((column.name,), bool(column.unique))
+
+        self.tables[model] = {}
+        self.columns[model] = [column.name for column in table.columns]
+        self.indexes[model] = {columns: {} for columns in indexes}
+        self.plans[model] = {}
+        self.unique[model] = [columns for columns, unique in indexes.items() if unique]
+        self.defaults[model] = [
+            (column.name, column.default) for column in table.columns
+        ]
+        self.onupdates[model] = [
+            (column.name, column.onupdate) for column in table.columns
+            if column.onupdate is not None
+        ]
+
+    def session(self) -> "MemorySession":
+        return MemorySession(self)
+
+    def clear(self) -> None:
+        for model in self.tables:
+            self.tables[model].clear()
+
+            for index in self.indexes[model].values():
+                index.clear()
+
+        self.locks.clear()
+        self.owners.clear()
+        self.waiting.clear()
+
+    def plan(self, model: Type[BaseModel], keys: frozenset) -> tuple[str, ...] | None:
+        plans = self.plans[model]
+
+        if keys not in plans:
+            plans[keys] = next(
+                (columns for columns in self.indexes[model] if keys.issuperset(columns)),
+                None
+            )
+
+        return plans[keys]
+
+    def lookup(self, model: Type[BaseModel], criteria: dict) -> list[str]:
+        if "id" in criteria:
+            return [criteria["id"]]
+
+        columns = self.plan(model, frozenset(criteria))
+
+        if columns is None:
+            return list(self.tables[model])
+
+        return list(self.indexes[model][columns].get(tuple(criteria[column] for column in columns), ()))
+
+    # A row is locked while its key is in self.locks, mapped to the queue
+    # of sessions waiting for it. Keys are dropped on release, so the table
+    # only holds currently locked rows, and waiter futures belong to the
+    # event loop that is waiting on them.
+    async def acquire(self, key: tuple[Type[BaseModel], str], session: "MemorySession") -> None:
+        waiters = self.locks.get(key)
+
+        if waiters is None:
+            self.locks[key] = deque()
+            self.owners[key] = session
+            return
+
+        self.check_deadlock(key, session)
+
+        waiter = (asyncio.get_running_loop().create_future(), session)
+        waiters.append(waiter)
+        self.waiting[session] = key
+
+        try:
+            await waiter[0]
+        except asyncio.CancelledError:
+            if waiter[0].done() and not waiter[0].cancelled():
+                self.release(key)
+            elif waiter in waiters:
+                waiters.remove(waiter)
+            raise
+        finally:
+            del self.waiting[session]
+
+    # Follows the chain of lock owners that are themselves waiting. If it
+    # leads back to the requesting session, waiting would never end, so the
+    # request fails instead, as Postgres aborts one side of a deadlock.
+    def check_deadlock(self, key: tuple[Type[BaseModel], str], session: "MemorySession") -> None:
+        owner = self.owners[key]
+
+        while owner is not session:
+            waiting_for = self.waiting.get(owner)
+
+            if waiting_for is None:
+                return
+
+            owner = self.owners[waiting_for]
+
+        raise MemoryDeadlockError(
+            f"Deadlock detected while locking {key[1]!r} in {key[0].__tablename__}"
+        )
+
+    def release(self, key: tuple[Type[BaseModel], str]) -> None:
+        waiters = self.locks[key]
+
+        while waiters:
+            future, session = waiters.popleft()
+
+            if not future.done():
+                self.owners[key] = session
+                future.set_result(None)
+                return
+
+        del self.locks[key]
+        del self.owners[key]
+
+    def apply(
+        self,
+        inserts: list[tuple[Type[BaseModel], dict]],
+        updates: list[tuple[Type[BaseModel], dict]],
+        deletes: list[tuple[Type[BaseModel], str]]
+    ) -> None:
+        self.validate(inserts, updates, deletes)
+
+        for model, id in deletes:
+            self.remove(model, self.tables[model].pop(id))
+
+        for model, changes in updates:
+            old_row = self.tables[model][changes["id"]]
+            new_row = {**old_row, **changes}
+            self.tables[model][changes["id"]] = new_row
+
+            for columns, index in self.indexes[model].items():
+                old_value = tuple(old_row[column] for column in columns)
+                new_value = tuple(new_row[column] for column in columns)
+
+                if old_value != new_value:
+                    ids = index[old_value]
+                    del ids[new_row["id"]]
+
+                    if not ids:
+                        del index[old_value]
+
+                    index.setdefault(new_value, {})[new_row["id"]] = None
+
+        for model, row in inserts:
+            self.insert(model, row)
+
+    def validate(
+        self,
+        inserts: list[tuple[Type[BaseModel], dict]],
+        updates: list[tuple[Type[BaseModel], dict]],
+        deletes: list[tuple[Type[BaseModel], str]]
+    ) -> None:
+        released = set(deletes)
+        claimed = set()
+        inserted = set()
+
+        for model, id in deletes + [(model, row["id"]) for model, row in updates]:
+            if id not in self.tables[model]:
+                raise MemoryStaleDataError(
+                    f"Row {id!r} in {model.__tablename__} was deleted by another session"
+                )
+
+        for model, row in inserts:
+            key = (model, row["id"])
+
+            if key in inserted or row["id"] in self.tables[model] and key not in released:
+                raise MemoryIntegrityError(f"Duplicate id {row['id']!r} in {model.__tablename__}")
+
+            inserted.add(key)
+
+        for model, row in inserts + updates:
+            if not any(row.keys() & set(columns) for columns in self.unique[model]):
+                continue
+
+            current = {**self.tables[model].get(row["id"], {}), **row}
+
+            for columns in self.unique[model]:
+                value = tuple(current[column] for column in columns)
+                owners = self.indexes[model][columns].get(value, {})
+
+                if (model, columns, value) in claimed or any(
+                    id != row["id"] and (model, id) not in released
+                    for id in owners
+                ):
+                    raise MemoryIntegrityError(
+                        f"Duplicate {', '.join(columns)} in {model.__tablename__}"
+                    )
+
+                claimed.add((model, columns, value))
+
+    def insert(self, model: Type[BaseModel], row: dict) -> None:
+        self.tables[model][row["id"]] = row
+
+        for columns, index in self.indexes[model].items():
+            index.setdefault(tuple(row[column] for column in columns), {})[row["id"]] = None
+
+    def remove(self, model: Type[BaseModel], row: dict) -> None:
+        for columns, index in self.indexes[model].items():
+            value = tuple(row[column] for column in columns)
+            ids = index[value]
+            del ids[row["id"]]
+
+            if not ids:
+                del index[value]
+
+class MemorySession:
+    def __init__(self, database: MemoryDatabase):
+        self.database = database
+        self.records: dict[tuple[Type[BaseModel], str], MemoryRecord] = {}
+        self.snapshots: dict[tuple[Type[BaseModel], str], dict | None] = {}
+        self.deleted: set[tuple[Type[BaseModel], str]] = set()
+        self.locks: set[tuple[Type[BaseModel], str]] = set()
+        self.dirty: set[tuple[Type[BaseModel], str]] = set()
+        self.pending: dict[Type[BaseModel], dict[str, None]] = {}
+
+    async def __aenter__(self) -> "MemorySession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def values(self, record: MemoryRecord) -> dict:
+        return {column: record.__dict__[column] for column in self.database.columns[record._model]}
+
+    def new(self, model: Type[BaseModel], values: dict) -> MemoryRecord:
+        row = dict(values)
+
+        for column, default in self.database.defaults[model]:
+            if column not in row:
+                row[column] = (
+                    None if default is None
+                    else default.arg(None) if default.is_callable
+                    else default.arg
+                )
+
+        record = MemoryRecord(self, model, row)
+        self.records[(model, row["id"])] = record
+        self.snapshots[(model, row["id"])] = None
+        self.pending.setdefault(model, {})[row["id"]] = None
+        return record
+
+    def add(self, record: MemoryRecord) -> None:
+        key = (record._model, record.id)
+        record.__dict__["_session"] = self
+
+        if key not in self.records:
+            self.records[key] = record
+            self.snapshots[key] = self.database.tables[record._model].get(record.id)
+            self.dirty.add(key)
+
+    def get(self, model: Type[BaseModel], id: str, refresh: bool = False) -> MemoryRecord | None:
+        key = (model, id)
+
+        if key in self.deleted:
+            return None
+
+        record = self.records.get(key)
+        row = self.database.tables[model].get(id)
+
+        if record is None:
+            if row is None:
+                return None
+
+            record = MemoryRecord(self, model, row)
+            self.records[key] = record
+            self.snapshots[key] = row
+        elif refresh and row is not None:
+            record.__dict__.update(row)
+            self.snapshots[key] = row
+
+        return record
+
+    def select(self, model: Type[BaseModel], criteria: dict, limit: int | None = None) -> list[MemoryRecord]:
+        if criteria.keys() == {"id"}:
+            record = self.get(model, criteria["id"])
+            return [] if record is None else [record]
+
+        ids = self.database.lookup(model, criteria)
+
+        if model in self.pending:
+            ids += self.pending[model]
+
+        results = []
+
+        for id in dict.fromkeys(ids):
+            key = (model, id)
+
+            if key in self.records:
+                values = self.records[key].__dict__
+            else:
+                values = self.database.tables[model].get(id)
+
+            if values is None or key in self.deleted:
+                continue
+
+            if all(values[column] == value for column, value in criteria.items()):
+                results.append(self.get(model, id))
+
+                if limit is not None and len(results) >= limit:
+                    break
+
+        return results
+
+    def first(self, model: Type[BaseModel], criteria: dict) -> MemoryRecord | None:
+        results = self.select(model, criteria, limit=1)
+        return results[0] if results else None
+
+    def resolve(self, record: MemoryRecord, relationship: RelationshipProperty) -> Any:
+        (local, remote), = relationship.local_remote_pairs
+        value = record.__dict__[local.name]
+        target = relationship.mapper.class_
+
+        if relationship.uselist:
+            return self.select(target, {remote.name: value})
+
+        if value is None:
+            return None
+
+        return self.first(target, {remote.name: value})
+
+    async def lock(self, model: Type[BaseModel], ids: list[str]) -> None:
+        await self.lock_keys({(model, id) for id in ids} - self.locks)
+
+    # Mirrors UPDATE ... SET column = column + delta: the row is locked and
+    # the delta is added to its committed value, unless this session has
+    # already changed the column, in which case that change is flushed first.
+    async def increment(self, model: Type[BaseModel], column: str, values: dict[str, int]) -> None:
+        await self.lock(model, list(values))
+
+        for id, value in values.items():
+            record = self.get(model, id)
+
+            if record is None:
+                continue
+
+            row = self.database.tables[model].get(id)
+            snapshot = self.snapshots[(model, id)]
+            current = record.__dict__[column]
+
+            if snapshot is not None and current == snapshot[column]:
+                if row is None:
+                    continue
+
+                current = row[column]
+
+            setattr(record, column, current + value)
+
+    def delete(self, record: MemoryRecord) -> None:
+        for relationship in record._model.__mapper__.relationships:
+            if relationship.uselist:
+                (_, remote), = relationship.local_remote_pairs
+
+                for child in getattr(record, relationship.key):
+                    setattr(child, remote.name, None)
+
+        key = (record._model, record.id)
+        self.records.pop(key, None)
+        self.snapshots.pop(key, None)
+        self.dirty.discard(key)
+        self.pending.get(record._model, {}).pop(record.id, None)
+
+        if record.id in self.database.tables[record._model]:
+            self.deleted.add(key)
+
+    async def commit(self) -> None:
+        inserts = [
+            (model, self.values(self.records[(model, id)]))
+            for model, ids in self.pending.items() for id in ids
+        ]
+        updates = []
+
+        for key in self.dirty:
+            record = self.records.get(key)
+            snapshot = self.snapshots.get(key)
+
+            if record is None or snapshot is None:
+                continue
+
+            model = key[0]
+            values = self.values(record)
+            changes = {
+                column: value for column, value in values.items()
+                if snapshot[column] != value
+            }
+
+            if changes:
+                for column, onupdate in self.database.onupdates[model]:
+                    if column not in changes:
+                        changes[column] = record.__dict__[column] = onupdate.arg(None)
+
+                updates.append((model, {"id": record.id, **changes}))
+
+        written = {(model, changes["id"]) for model, changes in updates} | self.deleted
+        await self.lock_keys(written - self.locks)
+
+        self.database.apply(inserts, updates, list(self.deleted))
+
+        for model, row in inserts + updates:
+            key = (model, row["id"])
+            row = self.database.tables[model][row["id"]]
+            self.records[key].__dict__.update(row)
+            self.snapshots[key] = row
+
+        self.deleted.clear()
+        self.dirty.clear()
+        self.pending.clear()
+        self.release()
+
+    async def rollback(self) -> None:
+        self.records.clear()
+        self.snapshots.clear()
+        self.deleted.clear()
+        self.dirty.clear()
+        self.pending.clear()
+        self.release()
+
+    async def close(self) -> None:
+        await self.rollback()
+
+    async def lock_keys(self, keys: set[tuple[Type[BaseModel], str]]) -> None:
+        for key in sorted(keys, key=lambda key: (key[0].__tablename__, key[1])):
+            await self.database.acquire(key, self)
+            self.locks.add(key)
+
+    def release(self) -> None:
+        for key in self.locks:
+            self.database.release(key)
+
+        self.locks.clear()
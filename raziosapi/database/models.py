@@ -1,6 +1,6 @@
 from time import time
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import JSON, ForeignKey, Index
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -12,7 +12,7 @@ from sqlalchemy.orm import (
 class BaseModel(DeclarativeBase):
     __abstract__ = True
 
-    id: Mapped[str] = mapped_column(primary_key=True, autoincrement=True)
+    id: Mapped[str] = mapped_column(primary_key=True, autoincrement=False)
     created_at: Mapped[float] = mapped_column(default=time)
     updated_at: Mapped[float] = mapped_column(default=time, onupdate=time)
 
@@ -45,6 +45,7 @@ class WalletModel(BaseModel):
 
 class TransferModel(BaseModel):
     __tablename__ = "transfers"
+    __table_args__ = (Index("ix_transfers_receiver_id_from_cheque_id", "receiver_id", "from_cheque_id"),)
 
     sender_id: Mapped[str] = mapped_column(ForeignKey("wallets.id"))
     receiver_id: Mapped[str] = mapped_column(ForeignKey("wallets.id"))
@@ -123,3 +124,19 @@ class InvoiceModel(BaseModel):
     payments: Mapped[list["TransferModel"]] = relationship(
         back_populates="from_invoice", lazy="joined"
     )
+
+class JobModel(BaseModel):
+    __tablename__ = "jobs"
+
+    name: Mapped[str] = mapped_column(index=True)
+    state: Mapped[str] = mapped_column(index=True)
+    owner_id: Mapped[str] = mapped_column(ForeignKey("wallets.id"), nullable=True)
+    payload: Mapped[dict] = mapped_column(JSON, default=dict)
+    priority: Mapped[int] = mapped_column(default=0)
+    attempts: Mapped[int] = mapped_column(default=0)
+    run_at: Mapped[float] = mapped_column(default=time)
+    locked_at: Mapped[float] = mapped_column(nullable=True)
+    locked_by: Mapped[str] = mapped_column(nullable=True)
+    finished_at: Mapped[float] = mapped_column(nullable=True)
+    result: Mapped[dict] = mapped_column(JSON, nullable=True)
+    error: Mapped[str] = mapped_column(nullable=True)
@@ -10,3 +10,9 @@ class ChequeStates(str, Enum):
     ACTIVE = "ACTIVE"
     ACTIVATED = "ACTIVATED"
     DELETED = "DELETED"
+
+class JobStates(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
@@ -0,0 +1,2 @@
+from .core import Worker, enqueue, job
+from . import tasks
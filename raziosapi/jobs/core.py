@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import signal
+from dataclasses import dataclass
+from secrets import token_hex
+from time import time
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from raziosapi.config import (
+    WORKER_CONCURRENCY,
+    WORKER_POLL_INTERVAL,
+    WORKER_RETRY_DELAY,
+    WORKER_JOB_TIMEOUT,
+    WORKER_JOB_LEASE
+)
+from raziosapi.enums import JobStates
+from raziosapi.database.crud import CRUD
+from raziosapi.database.core import Session
+from raziosapi.database.memory import MemoryDatabase, MemorySession
+from raziosapi.database.models import JobModel
+
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class JobHandler:
+    func: Callable[..., Awaitable[dict | None]]
+    concurrency: int | None
+    max_attempts: int
+    on_failure: Callable[..., Awaitable[None]] | None
+
+handlers: dict[str, JobHandler] = {}
+
+def job(
+    name: str,
+    concurrency: int | None = None,
+    max_attempts: int = 3,
+    on_failure: Callable[..., Awaitable[None]] | None = None
+):
+    def decorator(func):
+        handlers[name] = JobHandler(func, concurrency, max_attempts, on_failure)
+        return func
+    return decorator
+
+async def enqueue(
+    session: AsyncSession | MemorySession,
+    name: str,
+    payload: dict[str, Any],
+    owner_id: str | None = None,
+    priority: int = 0
+) -> JobModel:
+    job = await CRUD(JobModel, session).create(
+        id=token_hex(16),
+        name=name,
+        state=JobStates.QUEUED,
+        owner_id=owner_id,
+        payload=payload,
+        priority=priority
+    )
+
+    if isinstance(session, MemorySession):
+        return await run_inline(session.database, job.id)
+
+    return job
+
+async def run_inline(database: MemoryDatabase, job_id: str) -> JobModel:
+    async with database.session() as session:
+        job = await CRUD(JobModel, session).get(id=job_id)
+        handler = handlers[job.name]
+
+        while True:
+            job.attempts += 1
+
+            try:
+                async with database.session() as handler_session:
+                    result = await handler.func(handler_session, **job.payload)
+            except Exception as exc:
+                job.error = repr(exc)
+
+                if job.attempts < handler.max_attempts:
+                    continue
+
+                job.state = JobStates.FAILED
+                job.finished_at = time()
+                job = await CRUD(JobModel, session).update(job)
+                logger.error("Job %s (%s) failed after %s attempts: %r", job.id, job.name, job.attempts, exc)
+
+                if handler.on_failure is not None:
+                    async with database.session() as handler_session:
+                        await handler.on_failure(handler_session, **job.payload)
+
+                return job
+
+            job.state = JobStates.DONE
+            job.result = result
+            job.error = None
+            job.finished_at = time()
+            return await CRUD(JobModel, session).update(job)
+
+class Worker:
+    def __init__(
+        self,
+        concurrency: int = WORKER_CONCURRENCY,
+        poll_interval: float = WORKER_POLL_INTERVAL,
+        session_factory: async_sessionmaker = Session
+    ):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.poll_interval = poll_interval
+        self.session_factory = session_factory
+        self.tasks: set[asyncio.Task] = set()
+        self.stopping = asyncio.Event()
+
+    # A job type's concurrency limit applies across all worker processes,
+    # so it is checked against the RUNNING rows whose lease is still live.
+    async def count_running(self, session: AsyncSession, names: list[str], now: float) -> dict[str, int]:
+        stmt = (
+            select(JobModel.name, func.count())
+            .where(
+                JobModel.name.in_(names),
+                JobModel.state == JobStates.RUNNING,
+                JobModel.locked_at > now - WORKER_JOB_LEASE
+            )
+            .group_by(JobModel.name)
+        )
+        return dict((await session.execute(stmt)).all())
+
+    async def available_names(self, session: AsyncSession, now: float) -> list[str]:
+        limited = [name for name, handler in handlers.items() if handler.concurrency is not None]
+        running = await self.count_running(session, limited, now) if limited else {}
+
+        return [
+            name for name, handler in handlers.items()
+            if handler.concurrency is None or running.get(name, 0) < handler.concurrency
+        ]
+
+    def stop(self) -> None:
+        self.stopping.set()
+
+    async def sleep(self, delay: float) -> None:
+        try:
+            await asyncio.wait_for(self.stopping.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def serve(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self.stop)
+
+        try:
+            await self.run()
+        finally:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(signum)
+
+    async def run(self) -> None:
+        failures = 0
+
+        try:
+            while not self.stopping.is_set():
+                await self.semaphore.acquire()
+
+                if self.stopping.is_set():
+                    self.semaphore.release()
+                    break
+
+                try:
+                    job = await self.claim()
+                except Exception:
+                    self.semaphore.release()
+                    failures += 1
+                    logger.exception("Failed to claim a job")
+                    await self.sleep(min(self.poll_interval * 2 ** failures, 60))
+                    continue
+
+                failures = 0
+
+                if job is None:
+                    self.semaphore.release()
+                    await self.sleep(self.poll_interval)
+                    continue
+
+                task = asyncio.create_task(self.execute(job))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+        finally:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    async def claim(self) -> JobModel | None:
+        now = time()
+
+        async with self.session_factory() as session:
+            names = await self.available_names(session, now)
+
+            if not names:
+                return None
+
+            stmt = (
+                select(JobModel)
+                .where(
+                    JobModel.name.in_(names),
+                    or_(
+                        and_(JobModel.state == JobStates.QUEUED, JobModel.run_at <= now),
+                        and_(
+                            JobModel.state == JobStates.RUNNING,
+                            JobModel.locked_at <= now - WORKER_JOB_LEASE
+                        )
+                    )
+                )
+                .order_by(JobModel.priority.desc(), JobModel.run_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            job = await session.scalar(stmt)
+
+            if job is None:
+                return None
+
+            # Two workers may both pass available_names for the last free
+            # slot. The advisory lock makes them recount one after another,
+            # and it is held until the claiming transaction commits.
+            limit = handlers[job.name].concurrency
+
+            if limit is not None:
+                await session.execute(select(func.pg_advisory_xact_lock(func.hashtext(job.name))))
+                running = await self.count_running(session, [job.name], now)
+
+                if running.get(job.name, 0) >= limit:
+                    return None
+
+            job.state = JobStates.RUNNING
+            job.attempts += 1
+            job.locked_at = now
+            job.locked_by = token_hex(8)
+            await session.commit()
+
+        return job
+
+    async def execute(self, job: JobModel) -> None:
+        handler = handlers[job.name]
+
+        try:
+            async with self.session_factory() as session:
+                result = await asyncio.wait_for(
+                    handler.func(session, **job.payload), WORKER_JOB_TIMEOUT
+                )
+        except Exception as exc:
+            if job.attempts < handler.max_attempts:
+                delay = WORKER_RETRY_DELAY * 2 ** (job.attempts - 1)
+                await self.finish(job, state=JobStates.QUEUED, run_at=time() + delay, error=repr(exc))
+            elif await self.finish(job, state=JobStates.FAILED, finished_at=time(), error=repr(exc)):
+                logger.error("Job %s (%s) failed after %s attempts: %r", job.id, job.name, job.attempts, exc)
+                await self.compensate(job, handler)
+        else:
+            await self.finish(job, state=JobStates.DONE, finished_at=time(), result=result, error=None)
+        finally:
+            self.semaphore.release()
+
+    async def compensate(self, job: JobModel, handler: JobHandler) -> None:
+        if handler.on_failure is None:
+            return
+
+        try:
+            async with self.session_factory() as session:
+                await handler.on_failure(session, **job.payload)
+        except Exception:
+            logger.exception("Compensation of job %s (%s) failed", job.id, job.name)
+
+    async def finish(self, job: JobModel, **values) -> bool:
+        stmt = (
+            update(JobModel)
+            .where(
+                JobModel.id == job.id,
+                JobModel.state == JobStates.RUNNING,
+                JobModel.locked_by == job.locked_by
+            )
+            .values(locked_at=None, locked_by=None, **values)
+        )
+
+        async with self.session_factory() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+            owned = result.rowcount == 1
+
+        if not owned:
+            logger.warning("Job %s (%s) was reclaimed by another worker", job.id, job.name)
+            return False
+
+        return True
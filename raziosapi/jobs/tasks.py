@@ -0,0 +1,28 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from raziosapi.enums import ChequeStates
+from raziosapi.jobs.core import job
+from raziosapi.database.crud import CRUD
+from raziosapi.database.models import ChequeModel, WalletModel
+
+
+async def restore_cheque(session: AsyncSession, cheque_id: str) -> None:
+    cheque = await CRUD(ChequeModel, session).get(id=cheque_id)
+
+    if cheque is not None and cheque.state == ChequeStates.DELETED:
+        cheque.state = ChequeStates.ACTIVE
+        await CRUD(ChequeModel, session).update(cheque)
+
+@job("delete_cheque", concurrency=1, on_failure=restore_cheque)
+async def delete_cheque(session: AsyncSession, cheque_id: str) -> dict:
+    cheque = await CRUD(ChequeModel, session).get(id=cheque_id)
+
+    if cheque is None or cheque.state != ChequeStates.DELETED:
+        return {"refund_amount": 0}
+
+    refund_amount = cheque.amount * (cheque.max_activations_count - cheque.activations_count)
+    cheque.owner.balance += refund_amount
+
+    await CRUD(ChequeModel, session).delete(cheque)
+
+    return {"refund_amount": refund_amount}
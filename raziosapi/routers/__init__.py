@@ -2,3 +2,4 @@ from .wallet import wallet_router
 from .transfers import transfers_router
 from .cheques import cheques_router
 from .invoices import invoices_router
+from .jobs import jobs_router
@@ -10,9 +10,11 @@ from raziosapi.schemas import (
     CreateCheque,
     ChequeActivate,
     ChequeResponse,
+    JobResponse,
     TransferResponse,
     OwnChequeResponse
 )
+from raziosapi.jobs import enqueue
 from raziosapi.database.crud import CRUD
 from raziosapi.database.core import get_session
 from raziosapi.database.models import (
@@ -96,7 +98,7 @@ async def activate_cheque(
 
     return transfer
 
-@cheques_router.delete("/{id}/delete")
+@cheques_router.delete("/{id}/delete", status_code=202, response_model=JobResponse)
 async def delete_cheque(
     access_token: Annotated[str, Header()],
     id: str,
@@ -111,10 +113,6 @@ async def delete_cheque(
     if not cheque.owner_id == wallet.id:
         raise HTTPException(status_code=403, detail="You are not owner of cheque")
 
-    refund_amount = cheque.amount * (cheque.max_activations_count - cheque.activations_count)
-    wallet.balance += refund_amount
+    cheque.state = ChequeStates.DELETED
 
-    await CRUD(ChequeModel, session).delete(cheque)
-    await CRUD(WalletModel, session).update(wallet)
-    
-    return {"status_code": 400}
+    return await enqueue(session, "delete_cheque", {"cheque_id": cheque.id}, owner_id=wallet.id)
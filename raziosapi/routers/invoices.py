@@ -8,7 +8,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from raziosapi.enums import InvoiceStates
 from raziosapi.schemas import (
     CreateInvoice,
+    CreateInvoices,
     InvoicePay,
+    InvoicesPay,
     InvoiceResponse,
     OwnInvoiceResponse,
     TransferResponse
@@ -50,6 +52,27 @@ async def create_invoice(
 
     return invoice
 
+@invoices_router.post("/batch", response_model=list[InvoiceResponse])
+async def create_invoices(
+    access_token: Annotated[str, Header()],
+    data: CreateInvoices,
+    session: AsyncSession = Depends(get_session)
+):
+    wallet = await CRUD(WalletModel, session).get(access_token=access_token)
+    invoices = await CRUD(InvoiceModel, session).create_many([
+        dict(
+            id=token_hex(18),
+            state=InvoiceStates.ACTIVE,
+            owner_id=wallet.id,
+            amount=invoice.amount,
+            max_payments_count=invoice.max_payments_count,
+            expiration_at=invoice.expiration_at
+        )
+        for invoice in data.invoices
+    ])
+
+    return invoices
+
 @invoices_router.put("/{id}/pay", response_model=TransferResponse)
 async def pay_invoice(
     access_token: Annotated[str, Header()],
@@ -63,7 +86,7 @@ async def pay_invoice(
     if invoice.state != InvoiceStates.ACTIVE:
         raise HTTPException(status_code=403, detail="Invoice is not active")
 
-    if invoice.expiration_at >= time():
+    if invoice.expiration_at is not None and invoice.expiration_at <= time():
         raise HTTPException(status_code=404, detail="Invoice is expired")
 
     if wallet.balance < invoice.amount:
@@ -93,6 +116,66 @@ async def pay_invoice(
 
     return transfer
 
+@invoices_router.put("/pay", response_model=list[TransferResponse])
+async def pay_invoices(
+    access_token: Annotated[str, Header()],
+    data: InvoicesPay,
+    session: AsyncSession = Depends(get_session)
+):
+    wallet = await CRUD(WalletModel, session).get(access_token=access_token)
+
+    ids = sorted(set(data.ids))
+    invoices = await CRUD(InvoiceModel, session).get_many_for_update(ids)
+
+    if len(invoices) != len(ids):
+        raise HTTPException(status_code=404, detail="Invoice not found")
+
+    now = time()
+    credits = {}
+
+    for invoice in invoices:
+        if invoice.state != InvoiceStates.ACTIVE:
+            raise HTTPException(status_code=403, detail="Invoice is not active")
+
+        if invoice.expiration_at is not None and invoice.expiration_at <= now:
+            raise HTTPException(status_code=404, detail="Invoice is expired")
+
+        if invoice.amount == 0:
+            raise HTTPException(status_code=403, detail="Invoice amount is not fixed")
+
+        credits[invoice.owner_id] = credits.get(invoice.owner_id, 0) + invoice.amount
+
+    total_amount = sum(credits.values())
+    wallet_ids = sorted(credits.keys() | {wallet.id})
+    wallets = await CRUD(WalletModel, session).get_many_for_update(wallet_ids)
+    payer = next(locked for locked in wallets if locked.id == wallet.id)
+
+    if payer.balance < total_amount:
+        raise HTTPException(status_code=402, detail="Not enough coins")
+
+    credits[wallet.id] = credits.get(wallet.id, 0) - total_amount
+    await CRUD(WalletModel, session).increment_many(WalletModel.balance, credits)
+
+    for invoice in invoices:
+        invoice.payments_count += 1
+
+        if invoice.payments_count == invoice.max_payments_count:
+            invoice.state = InvoiceStates.PAID
+            invoice.paid_at = now
+
+    transfers = await CRUD(TransferModel, session).create_many([
+        dict(
+            id=token_hex(20),
+            sender_id=wallet.id,
+            receiver_id=invoice.owner_id,
+            amount=invoice.amount,
+            from_invoice_id=invoice.id
+        )
+        for invoice in invoices
+    ])
+
+    return transfers
+
 @invoices_router.delete("/{id}/delete")
 async def delete_invoice(
     access_token: Annotated[str, Header()],
@@ -0,0 +1,29 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from raziosapi.schemas import JobResponse
+from raziosapi.database.crud import CRUD
+from raziosapi.database.core import get_session
+from raziosapi.database.models import (
+    JobModel,
+    WalletModel
+)
+
+
+jobs_router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+@jobs_router.get("/{id}", response_model=JobResponse)
+async def get_job(
+    access_token: Annotated[str, Header()],
+    id: str,
+    session: AsyncSession = Depends(get_session)
+):
+    wallet = await CRUD(WalletModel, session).get(access_token=access_token)
+    job = await CRUD(JobModel, session).get(id=id, owner_id=wallet.id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
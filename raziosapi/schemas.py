@@ -1,15 +1,16 @@
-from typing import Annotated
+from typing import Annotated, Any
 
 from pydantic import BaseModel, Field
 
-from raziosapi.enums import ChequeStates, InvoiceStates
+from raziosapi.enums import ChequeStates, InvoiceStates, JobStates
 
 
 TelegramId = Annotated[int, Field(gt=0)]
 WalletIdStr = Annotated[str, Field(min_length=16, max_length=16)]
-TransferIdStr = Annotated[str, Field(min_length=20, max_length=20)]
-ChequeIdStr = Annotated[str, Field(min_length=18, max_length=18)]
-InvoiceIdStr = Annotated[str, Field(min_length=18, max_length=18)]
+TransferIdStr = Annotated[str, Field(min_length=40, max_length=40)]
+ChequeIdStr = Annotated[str, Field(min_length=36, max_length=36)]
+InvoiceIdStr = Annotated[str, Field(min_length=36, max_length=36)]
+JobIdStr = Annotated[str, Field(min_length=32, max_length=32)]
 PasswordStr = Annotated[str, Field(min_length=1, max_length=128)]
 Timestamp = Annotated[float, Field(gt=0)]
 
@@ -33,9 +34,15 @@ class CreateInvoice(BaseModel):
     max_payments_count: int = Field(ge=0)
     expiration_at: Timestamp | None
 
+class CreateInvoices(BaseModel):
+    invoices: list[CreateInvoice] = Field(min_length=1, max_length=100)
+
 class InvoicePay(BaseModel):
     amount: int | None = Field(ge=0)
 
+class InvoicesPay(BaseModel):
+    ids: list[InvoiceIdStr] = Field(min_length=1, max_length=100)
+
 class OwnWalletResponse(BaseModel):
     id: WalletIdStr
     telegram_id: TelegramId
@@ -81,3 +88,14 @@ class OwnInvoiceResponse(InvoiceResponse):
 
     class Config:
         from_attributes = True
+
+class JobResponse(BaseModel):
+    id: JobIdStr
+    name: str
+    state: JobStates
+    priority: int
+    attempts: int = Field(ge=0)
+    result: Any | None
+    error: str | None
+    created_at: Timestamp
+    finished_at: Timestamp | None
@@ -0,0 +1,45 @@
+import os
+
+os.environ.setdefault("DB_BACKEND", "memory")
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from raziosapi.config import TEST_DB_URL
+from raziosapi.database.memory import MemoryDatabase
+from raziosapi.database.models import BaseModel
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(params=["memory", "sqlalchemy"])
+async def session_factory(request):
+    if request.param == "memory":
+        yield MemoryDatabase(BaseModel).session
+        return
+
+    if not TEST_DB_URL:
+        pytest.skip("TEST_DB_URL is not set")
+
+    engine = create_async_engine(TEST_DB_URL)
+
+    try:
+        async with engine.connect():
+            pass
+    except (OSError, DBAPIError) as exc:
+        await engine.dispose()
+        pytest.skip(f"Postgres at TEST_DB_URL is unreachable: {exc!r}")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.drop_all)
+        await conn.run_sync(BaseModel.metadata.create_all)
+
+    yield async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.drop_all)
+
+    await engine.dispose()
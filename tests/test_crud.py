@@ -0,0 +1,305 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from raziosapi.database.crud import CRUD
+from raziosapi.database.memory import MemoryDeadlockError, MemoryIntegrityError
+from raziosapi.database.models import (
+    ChequeModel,
+    InvoiceModel,
+    TransferModel,
+    WalletModel
+)
+
+
+pytestmark = pytest.mark.anyio
+
+def wallet_id(number: int) -> str:
+    return f"{number:016d}"
+
+async def create_wallet(session_factory, number: int, balance: int = 0) -> None:
+    async with session_factory() as session:
+        await CRUD(WalletModel, session).create(
+            id=wallet_id(number),
+            telegram_id=number,
+            access_token=f"token{number}",
+            balance=balance
+        )
+
+async def get_balance(session_factory, number: int) -> int:
+    async with session_factory() as session:
+        wallet = await CRUD(WalletModel, session).get(id=wallet_id(number))
+        return wallet.balance
+
+async def test_create_and_get(session_factory):
+    await create_wallet(session_factory, 1, balance=10)
+
+    async with session_factory() as session:
+        by_id = await CRUD(WalletModel, session).get(id=wallet_id(1))
+        by_token = await CRUD(WalletModel, session).get(access_token="token1")
+        by_telegram_id = await CRUD(WalletModel, session).get(telegram_id=1)
+
+        assert by_id.balance == 10
+        assert by_token.id == by_telegram_id.id == wallet_id(1)
+        assert by_id.created_at > 0
+        assert await CRUD(WalletModel, session).get(id=wallet_id(2)) is None
+
+async def test_create_many(session_factory):
+    async with session_factory() as session:
+        wallets = await CRUD(WalletModel, session).create_many([
+            dict(id=wallet_id(number), telegram_id=number, access_token=f"token{number}")
+            for number in range(1, 4)
+        ])
+
+    assert [wallet.id for wallet in wallets] == [wallet_id(number) for number in range(1, 4)]
+    assert await get_balance(session_factory, 3) == 0
+
+async def test_create_many_with_joined_collections(session_factory):
+    await create_wallet(session_factory, 1)
+
+    async with session_factory() as session:
+        invoices = await CRUD(InvoiceModel, session).create_many([
+            dict(id=f"invoice{number}", state="ACTIVE", owner_id=wallet_id(1), amount=number)
+            for number in range(1, 4)
+        ])
+
+    assert [invoice.amount for invoice in invoices] == [1, 2, 3]
+
+    async with session_factory() as session:
+        wallet = await CRUD(WalletModel, session).get(id=wallet_id(1))
+        assert sorted(invoice.id for invoice in wallet.invoices) == [
+            f"invoice{number}" for number in range(1, 4)
+        ]
+
+async def test_is_exist(session_factory):
+    await create_wallet(session_factory, 1)
+    await create_wallet(session_factory, 2)
+
+    async with session_factory() as session:
+        await CRUD(TransferModel, session).create(
+            id="t" * 40,
+            sender_id=wallet_id(1),
+            receiver_id=wallet_id(2),
+            amount=5
+        )
+
+    async with session_factory() as session:
+        crud = CRUD(TransferModel, session)
+
+        assert await crud.is_exist(receiver_id=wallet_id(2), from_cheque_id=None)
+        assert not await crud.is_exist(receiver_id=wallet_id(1), from_cheque_id=None)
+
+async def test_order_by(session_factory):
+    for number, balance in ((1, 30), (2, 10), (3, 20)):
+        await create_wallet(session_factory, number, balance=balance)
+
+    async with session_factory() as session:
+        top = await CRUD(WalletModel, session).order_by(WalletModel.balance, 2)
+        bottom = await CRUD(WalletModel, session).order_by(WalletModel.balance, 2, use_desc=False)
+
+    assert [wallet.balance for wallet in top] == [30, 20]
+    assert [wallet.balance for wallet in bottom] == [10, 20]
+
+async def test_update(session_factory):
+    await create_wallet(session_factory, 1)
+
+    async with session_factory() as session:
+        wallet = await CRUD(WalletModel, session).get(id=wallet_id(1))
+        updated_at = wallet.updated_at
+        wallet.balance = 42
+        wallet = await CRUD(WalletModel, session).update(wallet)
+
+        assert wallet.balance == 42
+        assert wallet.updated_at >= updated_at
+
+    assert await get_balance(session_factory, 1) == 42
+
+async def test_update_across_commits(session_factory):
+    await create_wallet(session_factory, 1)
+    await create_wallet(session_factory, 2)
+
+    async with session_factory() as session:
+        first = await CRUD(WalletModel, session).get(id=wallet_id(1))
+        second = await CRUD(WalletModel, session).get(id=wallet_id(2))
+
+        for balance in (5, 7):
+            first.balance = balance
+            await session.commit()
+
+        second.balance = 9
+        await session.commit()
+
+    assert await get_balance(session_factory, 1) == 7
+    assert await get_balance(session_factory, 2) == 9
+
+async def test_delete_nullifies_children(session_factory):
+    await create_wallet(session_factory, 1)
+    await create_wallet(session_factory, 2)
+
+    async with session_factory() as session:
+        await CRUD(ChequeModel, session).create(
+            id="c" * 36,
+            state="ACTIVE",
+            owner_id=wallet_id(1),
+            amount=5,
+            has_password=False
+        )
+        await CRUD(TransferModel, session).create(
+            id="t" * 40,
+            sender_id=wallet_id(1),
+            receiver_id=wallet_id(2),
+            amount=5,
+            from_cheque_id="c" * 36
+        )
+
+    async with session_factory() as session:
+        cheque = await CRUD(ChequeModel, session).get(id="c" * 36)
+        await CRUD(ChequeModel, session).delete(cheque)
+
+    async with session_factory() as session:
+        assert await CRUD(ChequeModel, session).get(id="c" * 36) is None
+        transfer = await CRUD(TransferModel, session).get(id="t" * 40)
+        assert transfer.from_cheque_id is None
+
+async def test_unique_violation(session_factory):
+    await create_wallet(session_factory, 1)
+
+    with pytest.raises((IntegrityError, MemoryIntegrityError)):
+        async with session_factory() as session:
+            await CRUD(WalletModel, session).create(
+                id=wallet_id(2),
+                telegram_id=1,
+                access_token="other"
+            )
+
+    async with session_factory() as session:
+        assert await CRUD(WalletModel, session).get(id=wallet_id(2)) is None
+
+async def test_rollback_discards_changes(session_factory):
+    await create_wallet(session_factory, 1, balance=10)
+
+    async with session_factory() as session:
+        wallet = await CRUD(WalletModel, session).get(id=wallet_id(1))
+        wallet.balance = 99
+        await session.rollback()
+
+    assert await get_balance(session_factory, 1) == 10
+
+async def test_close_without_commit_discards_changes(session_factory):
+    await create_wallet(session_factory, 1, balance=10)
+
+    async with session_factory() as session:
+        wallet = await CRUD(WalletModel, session).get(id=wallet_id(1))
+        wallet.balance = 99
+
+    assert await get_balance(session_factory, 1) == 10
+
+async def test_for_update_blocks_lockers(session_factory):
+    await create_wallet(session_factory, 1, balance=10)
+
+    async with session_factory() as first:
+        [wallet] = await CRUD(WalletModel, first).get_many_for_update([wallet_id(1)])
+
+        async def lock_and_read():
+            async with session_factory() as second:
+                [locked] = await CRUD(WalletModel, second).get_many_for_update([wallet_id(1)])
+                return locked.balance
+
+        task = asyncio.create_task(lock_and_read())
+        await asyncio.sleep(0.2)
+        assert not task.done()
+
+        wallet.balance = 20
+        await first.commit()
+
+    assert await asyncio.wait_for(task, 5) == 20
+
+async def test_for_update_blocks_plain_writers(session_factory):
+    await create_wallet(session_factory, 1, balance=10)
+
+    async with session_factory() as first:
+        [wallet] = await CRUD(WalletModel, first).get_many_for_update([wallet_id(1)])
+
+        async def write():
+            async with session_factory() as second:
+                other = await CRUD(WalletModel, second).get(id=wallet_id(1))
+                other.telegram_id = 7
+                await second.commit()
+
+        task = asyncio.create_task(write())
+        await asyncio.sleep(0.2)
+        assert not task.done()
+
+        wallet.balance = 20
+        await first.commit()
+
+    await asyncio.wait_for(task, 5)
+
+    async with session_factory() as session:
+        wallet = await CRUD(WalletModel, session).get(id=wallet_id(1))
+
+    assert (wallet.balance, wallet.telegram_id) == (20, 7)
+
+async def test_increment_many(session_factory):
+    for number in (1, 2, 3):
+        await create_wallet(session_factory, number, balance=10)
+
+    async with session_factory() as session:
+        wallets = await CRUD(WalletModel, session).get_many_for_update(
+            [wallet_id(3), wallet_id(1), wallet_id(2)]
+        )
+        assert [wallet.id for wallet in wallets] == [wallet_id(1), wallet_id(2), wallet_id(3)]
+
+        await CRUD(WalletModel, session).increment_many(
+            WalletModel.balance, {wallet_id(1): -15, wallet_id(2): 5}
+        )
+        await session.commit()
+
+    assert [await get_balance(session_factory, number) for number in (1, 2, 3)] == [-5, 15, 10]
+
+async def test_increment_many_adds_to_committed_value(session_factory):
+    await create_wallet(session_factory, 1, balance=10)
+
+    async with session_factory() as session:
+        wallet = await CRUD(WalletModel, session).get(id=wallet_id(1))
+        assert wallet.balance == 10
+
+        async with session_factory() as other:
+            other_wallet = await CRUD(WalletModel, other).get(id=wallet_id(1))
+            other_wallet.balance = 100
+            await other.commit()
+
+        await CRUD(WalletModel, session).increment_many(
+            WalletModel.balance, {wallet_id(1): 5}
+        )
+        await session.commit()
+
+    assert await get_balance(session_factory, 1) == 105
+
+async def test_deadlock_aborts_one_session(session_factory):
+    await create_wallet(session_factory, 1)
+    await create_wallet(session_factory, 2)
+
+    async def write(session, number):
+        wallet = await CRUD(WalletModel, session).get(id=wallet_id(number))
+        wallet.balance = number
+
+        try:
+            await session.commit()
+        except (DBAPIError, MemoryDeadlockError):
+            await session.rollback()
+            raise
+
+    async with session_factory() as first, session_factory() as second:
+        await CRUD(WalletModel, first).get_many_for_update([wallet_id(1)])
+        await CRUD(WalletModel, second).get_many_for_update([wallet_id(2)])
+
+        results = await asyncio.wait_for(
+            asyncio.gather(write(first, 2), write(second, 1), return_exceptions=True),
+            timeout=10
+        )
+
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert len(errors) == 1
+    assert isinstance(errors[0], (DBAPIError, MemoryDeadlockError))
@@ -0,0 +1,105 @@
+from time import time
+
+import httpx
+import pytest
+
+from raziosapi.__main__ import app
+from raziosapi.database.core import get_session
+from raziosapi.database.crud import CRUD
+from raziosapi.database.models import WalletModel
+
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def client(session_factory):
+    async def override_get_session():
+        async with session_factory() as session:
+            yield session
+
+    async with session_factory() as session:
+        await CRUD(WalletModel, session).create_many([
+            dict(id="p" * 16, telegram_id=1, access_token="payer", balance=1000),
+            dict(id="m" * 16, telegram_id=2, access_token="merchant", balance=0)
+        ])
+
+    app.dependency_overrides[get_session] = override_get_session
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+    app.dependency_overrides.clear()
+
+async def create_invoices(client, *invoices) -> list[str]:
+    response = await client.post(
+        "/invoices/batch",
+        headers={"access-token": "merchant"},
+        json={"invoices": list(invoices)}
+    )
+    assert response.status_code == 200
+    return [invoice["id"] for invoice in response.json()]
+
+async def balances(client) -> tuple[int, int]:
+    payer = await client.get("/wallet/", headers={"access-token": "payer"})
+    merchant = await client.get("/wallet/", headers={"access-token": "merchant"})
+    return payer.json()["balance"], merchant.json()["balance"]
+
+def invoice(amount: int, max_payments_count: int = 1, expiration_at: float | None = None) -> dict:
+    return dict(
+        amount=amount,
+        max_payments_count=max_payments_count,
+        expiration_at=expiration_at
+    )
+
+async def test_batch_create(client):
+    ids = await create_invoices(client, invoice(10), invoice(20, expiration_at=time() + 60))
+
+    assert len(set(ids)) == 2
+
+    for id, amount in zip(ids, (10, 20)):
+        response = await client.get(f"/invoices/{id}", headers={"access-token": "payer"})
+        assert response.json()["amount"] == amount
+        assert response.json()["owner_id"] == "m" * 16
+
+async def test_pay_many(client):
+    ids = await create_invoices(client, invoice(10), invoice(20, max_payments_count=2))
+
+    response = await client.put("/invoices/pay", headers={"access-token": "payer"}, json={"ids": ids})
+
+    assert response.status_code == 200
+    assert sorted(transfer["amount"] for transfer in response.json()) == [10, 20]
+    assert await balances(client) == (970, 30)
+
+    response = await client.put("/invoices/pay", headers={"access-token": "payer"}, json={"ids": ids})
+
+    assert response.status_code == 403
+    assert await balances(client) == (970, 30)
+
+async def test_pay_many_not_enough_coins(client):
+    ids = await create_invoices(client, invoice(600), invoice(600))
+
+    response = await client.put("/invoices/pay", headers={"access-token": "payer"}, json={"ids": ids})
+
+    assert response.status_code == 402
+    assert await balances(client) == (1000, 0)
+
+async def test_pay_many_expired(client):
+    ids = await create_invoices(client, invoice(10), invoice(10, expiration_at=time() - 1))
+
+    response = await client.put("/invoices/pay", headers={"access-token": "payer"}, json={"ids": ids})
+
+    assert response.status_code == 404
+    assert await balances(client) == (1000, 0)
+
+async def test_pay_many_unknown_invoice(client):
+    ids = await create_invoices(client, invoice(10))
+
+    response = await client.put(
+        "/invoices/pay",
+        headers={"access-token": "payer"},
+        json={"ids": ids + ["0" * 36]}
+    )
+
+    assert response.status_code == 404
+    assert await balances(client) == (1000, 0)
@@ -0,0 +1,243 @@
+import asyncio
+from dataclasses import replace
+from time import time
+
+import httpx
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from raziosapi.__main__ import app
+from raziosapi.config import WORKER_JOB_LEASE
+from raziosapi.enums import ChequeStates, JobStates
+from raziosapi.jobs import Worker, enqueue
+from raziosapi.jobs.core import JobHandler, handlers
+from raziosapi.database.core import get_session
+from raziosapi.database.crud import CRUD
+from raziosapi.database.models import ChequeModel, JobModel, WalletModel
+
+
+pytestmark = pytest.mark.anyio
+
+CHEQUE_ID = "c" * 36
+
+@pytest.fixture
+async def client(session_factory):
+    async def override_get_session():
+        async with session_factory() as session:
+            yield session
+
+    async with session_factory() as session:
+        await CRUD(WalletModel, session).create_many([
+            dict(id="o" * 16, telegram_id=1, access_token="owner", balance=100),
+            dict(id="x" * 16, telegram_id=2, access_token="other", balance=0)
+        ])
+        await CRUD(ChequeModel, session).create(
+            id=CHEQUE_ID,
+            state=ChequeStates.ACTIVE,
+            owner_id="o" * 16,
+            amount=10,
+            max_activations_count=3,
+            activations_count=1,
+            has_password=False
+        )
+
+    app.dependency_overrides[get_session] = override_get_session
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+    app.dependency_overrides.clear()
+
+@pytest.fixture
+def sql_session_factory(session_factory):
+    if not isinstance(session_factory, async_sessionmaker):
+        pytest.skip("The worker claims jobs with SKIP LOCKED and needs Postgres")
+
+    return session_factory
+
+@pytest.fixture
+def test_handler(monkeypatch):
+    calls = {"runs": 0, "compensations": 0}
+
+    async def run(session, fail: int = 0) -> dict:
+        calls["runs"] += 1
+
+        if calls["runs"] <= fail:
+            raise RuntimeError("boom")
+
+        return {"runs": calls["runs"]}
+
+    async def compensate(session, fail: int = 0) -> None:
+        calls["compensations"] += 1
+
+    monkeypatch.setitem(handlers, "test_job", JobHandler(run, None, 2, compensate))
+    monkeypatch.setattr("raziosapi.jobs.core.WORKER_RETRY_DELAY", 0)
+    return calls
+
+async def get_job(session_factory, id: str) -> JobModel:
+    async with session_factory() as session:
+        return await CRUD(JobModel, session).get(id=id)
+
+async def drain(session_factory, id: str) -> JobModel:
+    worker = Worker(concurrency=2, poll_interval=0.01, session_factory=session_factory)
+    task = asyncio.create_task(worker.run())
+
+    try:
+        while True:
+            job = await get_job(session_factory, id)
+
+            if job.state in (JobStates.DONE, JobStates.FAILED):
+                return job
+
+            await asyncio.sleep(0.01)
+    finally:
+        worker.stop()
+        await asyncio.wait_for(task, 10)
+
+async def delete_cheque(client, session_factory) -> dict:
+    response = await client.delete(f"/cheques/{CHEQUE_ID}/delete", headers={"access-token": "owner"})
+    assert response.status_code == 202
+
+    job = response.json()
+
+    if job["state"] == JobStates.QUEUED:
+        await asyncio.wait_for(drain(session_factory, job["id"]), 10)
+
+    response = await client.get(f"/jobs/{job['id']}", headers={"access-token": "owner"})
+    assert response.status_code == 200
+    return response.json()
+
+async def test_delete_cheque_refunds(client, session_factory):
+    job = await delete_cheque(client, session_factory)
+
+    assert job["name"] == "delete_cheque"
+    assert job["state"] == JobStates.DONE
+    assert job["result"] == {"refund_amount": 20}
+
+    wallet = await client.get("/wallet/", headers={"access-token": "owner"})
+    assert wallet.json()["balance"] == 120
+
+    async with session_factory() as session:
+        assert await CRUD(ChequeModel, session).get(id=CHEQUE_ID) is None
+
+async def test_job_is_visible_only_to_owner(client, session_factory):
+    job = await delete_cheque(client, session_factory)
+
+    response = await client.get(f"/jobs/{job['id']}", headers={"access-token": "other"})
+    assert response.status_code == 404
+
+async def test_failed_delete_restores_cheque(client, session_factory, monkeypatch):
+    async def fail(session, cheque_id: str) -> None:
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(handlers, "delete_cheque", replace(handlers["delete_cheque"], func=fail))
+    monkeypatch.setattr("raziosapi.jobs.core.WORKER_RETRY_DELAY", 0)
+
+    job = await delete_cheque(client, session_factory)
+
+    assert job["state"] == JobStates.FAILED
+    assert job["attempts"] == handlers["delete_cheque"].max_attempts
+    assert "boom" in job["error"]
+
+    async with session_factory() as session:
+        cheque = await CRUD(ChequeModel, session).get(id=CHEQUE_ID)
+        assert cheque.state == ChequeStates.ACTIVE
+
+    wallet = await client.get("/wallet/", headers={"access-token": "owner"})
+    assert wallet.json()["balance"] == 100
+
+async def test_worker_runs_job(sql_session_factory, test_handler):
+    async with sql_session_factory() as session:
+        job = await enqueue(session, "test_job", {})
+
+    assert job.state == JobStates.QUEUED
+
+    job = await drain(sql_session_factory, job.id)
+
+    assert job.state == JobStates.DONE
+    assert job.result == {"runs": 1}
+    assert job.attempts == 1
+    assert job.locked_by is None
+
+async def test_worker_retries_then_succeeds(sql_session_factory, test_handler):
+    async with sql_session_factory() as session:
+        job = await enqueue(session, "test_job", {"fail": 1})
+
+    job = await drain(sql_session_factory, job.id)
+
+    assert job.state == JobStates.DONE
+    assert job.attempts == 2
+    assert job.error is None
+    assert test_handler["compensations"] == 0
+
+async def test_worker_compensates_after_last_attempt(sql_session_factory, test_handler):
+    async with sql_session_factory() as session:
+        job = await enqueue(session, "test_job", {"fail": 2})
+
+    job = await drain(sql_session_factory, job.id)
+
+    assert job.state == JobStates.FAILED
+    assert job.attempts == 2
+    assert "boom" in job.error
+    assert test_handler["compensations"] == 1
+
+async def test_retry_is_delayed(sql_session_factory, test_handler, monkeypatch):
+    monkeypatch.setattr("raziosapi.jobs.core.WORKER_RETRY_DELAY", 30)
+    worker = Worker(session_factory=sql_session_factory)
+
+    async with sql_session_factory() as session:
+        job = await enqueue(session, "test_job", {"fail": 1})
+
+    claimed = await worker.claim()
+    assert claimed.id == job.id
+
+    started = time()
+    await worker.semaphore.acquire()
+    await worker.execute(claimed)
+
+    job = await get_job(sql_session_factory, job.id)
+    assert job.state == JobStates.QUEUED
+    assert job.run_at >= started + 30
+    assert await worker.claim() is None
+
+async def test_expired_lease_is_reclaimed(sql_session_factory, test_handler):
+    first, second = (Worker(session_factory=sql_session_factory) for _ in range(2))
+
+    async with sql_session_factory() as session:
+        job = await enqueue(session, "test_job", {})
+
+    stale = await first.claim()
+    assert await second.claim() is None
+
+    async with sql_session_factory() as session:
+        await session.execute(
+            update(JobModel)
+            .where(JobModel.id == job.id)
+            .values(locked_at=time() - WORKER_JOB_LEASE - 1)
+        )
+        await session.commit()
+
+    reclaimed = await second.claim()
+
+    assert reclaimed.id == job.id
+    assert reclaimed.attempts == 2
+    assert reclaimed.locked_by != stale.locked_by
+    assert await first.finish(stale, state=JobStates.DONE) is False
+    assert await second.finish(reclaimed, state=JobStates.DONE) is True
+
+async def test_concurrency_limit_spans_workers(sql_session_factory, test_handler):
+    handlers["test_job"].concurrency = 1
+    workers = [Worker(session_factory=sql_session_factory) for _ in range(4)]
+
+    async with sql_session_factory() as session:
+        for _ in range(4):
+            await enqueue(session, "test_job", {})
+
+    claimed = [job for job in await asyncio.gather(*(worker.claim() for worker in workers)) if job]
+    assert len(claimed) == 1
+    assert await workers[0].claim() is None
+
+    await workers[0].finish(claimed[0], state=JobStates.DONE)
+    assert await workers[1].claim() is not None